@@ -1,14 +1,19 @@
+from __future__ import annotations
+
 import dataclasses
-import itertools
+import math
 import string
+import time
 from collections import Counter
-from typing import Iterable
+from collections.abc import Collection, Iterator
+from typing import Any, Iterable
 
 import unidecode
 
 from wordtools.words import WordGrouper
 
 type KeyType = tuple[str, ...]
+type LetterCounts = tuple[tuple[str, int], ...]
 
 
 @dataclasses.dataclass
@@ -26,93 +31,345 @@ class Anagrammer(WordGrouper[KeyType]):
     Pre-computes and groups anagrams of single words.
     """
 
+    def __init__(self, words: Collection[str]) -> None:
+        # Anagram keys bucketed by the set of letters they contain, built on demand.
+        self._keys_by_mask: dict[int, list[tuple[KeyType, LetterCounts]]] | None = None
+        super().__init__(words)
+
     def group_key(self, word: str) -> KeyType:
         normalised = unidecode.unidecode(word).lower()
         return tuple(sorted(c for c in normalised if c in string.ascii_lowercase))
 
+    def add_word(self, word: str) -> None:
+        super().add_word(word)
+        self._keys_by_mask = None
+
+    def remove_word(self, word: str) -> None:
+        super().remove_word(word)
+        self._keys_by_mask = None
+
+    def subanagrams(self, letters: str, min_length: int = 1) -> dict[int, list[str]]:
+        """
+        Finds all words that can be made from some or all of the given letters, each
+        letter being used at most as many times as it appears.
+
+        Returns the words grouped by the number of letters they use.
+        """
+        by_length: dict[int, list[str]] = {}
+        for key in self._get_subkeys(self.group_key(letters)):
+            if len(key) >= min_length:
+                by_length.setdefault(len(key), []).extend(self._groups[key])
+
+        for words in by_length.values():
+            words.sort()
+
+        return by_length
+
+    def _get_subkeys(self, rack_key: KeyType) -> Iterator[KeyType]:
+        """
+        Yields every anagram key that can be made from some or all of rack_key.
+        """
+        if self._keys_by_mask is None:
+            self._keys_by_mask = {}
+            for key in self._groups:
+                if key:
+                    self._keys_by_mask.setdefault(_letter_mask(key), []).append(
+                        (key, _letter_counts(key))
+                    )
+
+        rack_mask = _letter_mask(rack_key)
+        rack_counts = Counter(rack_key)
+
+        # Only keys whose letters are a subset of the rack's letters can match. These
+        # are found by enumerating subsets of the rack's letters, unless there are
+        # fewer buckets to check than that.
+        if 2 ** rack_mask.bit_count() <= len(self._keys_by_mask):
+            masks: Iterable[int] = _submasks(rack_mask)
+        else:
+            masks = (mask for mask in self._keys_by_mask if mask & ~rack_mask == 0)
+
+        for mask in masks:
+            for key, counts in self._keys_by_mask.get(mask, []):
+                if len(key) > len(rack_key):
+                    continue
+                if all(rack_counts[letter] >= count for letter, count in counts):
+                    yield key
+
     def anagram_phrase(self, phrase: str, options: AnagramOptions) -> Iterable[str]:
         # TODO: Support include/exclude words
+        return _AnagramSearch(self, self.group_key(phrase), options).run()
+
+    def anagram_page(
+        self,
+        phrase: str,
+        options: AnagramOptions,
+        *,
+        cursor: AnagramCursor | None = None,
+        limit: int = 0,
+        max_seconds: float = 0,
+        max_nodes: int = 0,
+    ) -> tuple[list[str], AnagramCursor | None]:
+        """
+        Returns up to limit anagrams of phrase, continuing from cursor if given, and a
+        cursor from which to fetch the next page. The cursor is None once there are no
+        more anagrams.
 
+        The search also stops after max_seconds, or after visiting max_nodes nodes of
+        the search tree, so a page may have fewer than limit anagrams (or none) even
+        if there are more to come.
+        """
         phrase_key = self.group_key(phrase)
 
-        for ngram_group in self._get_ngram_groups(
-            phrase_key=phrase_key, ancestors=(), options=options
-        ):
-            for words in itertools.product(*(self._groups[key] for key in ngram_group)):
-                yield " ".join(words)
+        if cursor is None:
+            search = _AnagramSearch(self, phrase_key, options)
+        elif cursor.phrase_key != phrase_key:
+            raise ValueError("Cursor is for a different phrase")
+        else:
+            search = _AnagramSearch.resume(self, cursor, options)
 
-    def _get_ngram_groups(
-        self,
-        *,
-        phrase_key: KeyType,
-        ancestors: tuple[KeyType, ...],
-        options: AnagramOptions,
-    ) -> Iterable[tuple[KeyType, ...]]:
+        phrases = list(
+            search.run(limit=limit, max_seconds=max_seconds, max_nodes=max_nodes)
+        )
+        return phrases, search.cursor()
+
+    def _get_ngrams(
+        self, phrase_key: KeyType, parent: KeyType, options: AnagramOptions
+    ) -> list[KeyType]:
         """
-        Yields all unique groups of ngrams that sum to the original phrase_key, and exist as anagram keys.
+        Returns every unique ngram in phrase_key that is also a known anagram key and
+        may follow parent, longest first, then in sorted order.
+        """
+        min_len = options.min_word_length or 1
+        max_len = options.max_word_length or len(phrase_key)
+
+        ngrams = [
+            ngram
+            for ngram in self._get_subkeys(phrase_key)
+            if min_len <= len(ngram) <= max_len
+            and (parent == () or _ngram_order(ngram) >= _ngram_order(parent))
+        ]
+        ngrams.sort(key=_ngram_order)
+        return ngrams
+
+
+@dataclasses.dataclass
+class AnagramCursor:
+    """
+    A position in the search for anagrams of a phrase, from which it can be resumed.
+
+    positions holds the index of the current ngram in each level of the search, and
+    ancestors the ngrams themselves. The last level may not have started yet, in
+    which case its position is -1 and it has no ancestor.
+
+    If the ancestors make up a complete anagram, phrase_index is the number of its
+    phrases already produced.
+    """
+
+    phrase_key: KeyType
+    ancestors: list[KeyType]
+    positions: list[int]
+    phrase_index: int | None = None
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "phrase": "".join(self.phrase_key),
+            "ancestors": ["".join(ngram) for ngram in self.ancestors],
+            "positions": self.positions,
+            "phrase_index": self.phrase_index,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> AnagramCursor:
+        return cls(
+            phrase_key=tuple(data["phrase"]),
+            ancestors=[tuple(ngram) for ngram in data["ancestors"]],
+            positions=list(data["positions"]),
+            phrase_index=data["phrase_index"],
+        )
 
-        This is done by constructing a trie.
 
-        - We only care about one group at a time, so DFS is appropriate here.
-        - Order of ngrams within a group is not meaningful, so to remove dupes, enforce ordering:
-            - Put longest ngrams first because they're more interesting.
-            - Child ngrams must be same length or shorter than their parent
-            - If child ngrams are the same length, order them to avoid duplicates
+@dataclasses.dataclass
+class _Frame:
+    remainder: KeyType
+    ngrams: list[KeyType]
+    position: int = -1
+
+
+class _AnagramSearch:
+    """
+    Finds all unique groups of ngrams that sum to the original phrase_key, and exist
+    as anagram keys, and yields the phrases made from each group.
+
+    This is a DFS of a trie of ngrams, with the stack kept explicitly so that the
+    search can be paused and resumed from an AnagramCursor.
+
+    - We only care about one group at a time, so DFS is appropriate here.
+    - Order of ngrams within a group is not meaningful, so to remove dupes, enforce ordering:
+        - Put longest ngrams first because they're more interesting.
+        - Child ngrams must be same length or shorter than their parent
+        - If child ngrams are the same length, order them to avoid duplicates
+    """
+
+    def __init__(
+        self, anagrammer: Anagrammer, phrase_key: KeyType, options: AnagramOptions
+    ) -> None:
+        self._anagrammer = anagrammer
+        self._phrase_key = phrase_key
+        self._options = options
+
+        self._stack = [
+            _Frame(phrase_key, anagrammer._get_ngrams(phrase_key, (), options))
+        ]
+        self._phrase_index: int | None = None
+
+    @classmethod
+    def resume(
+        cls, anagrammer: Anagrammer, cursor: AnagramCursor, options: AnagramOptions
+    ) -> _AnagramSearch:
+        search = cls(anagrammer, cursor.phrase_key, options)
+        search._stack = []
+
+        remainder = cursor.phrase_key
+        parent: KeyType = ()
+        for level, position in enumerate(cursor.positions):
+            ngrams = anagrammer._get_ngrams(remainder, parent, options)
+            search._stack.append(_Frame(remainder, ngrams, position))
+            if position == -1:
+                break
+            if position >= len(ngrams) or ngrams[position] != cursor.ancestors[level]:
+                raise ValueError("Cursor does not match this search")
+            parent = ngrams[position]
+            remainder = _subtract(remainder, parent)
+
+        search._phrase_index = cursor.phrase_index
+
+        return search
+
+    def cursor(self) -> AnagramCursor | None:
+        if not self._stack:
+            return None
+
+        return AnagramCursor(
+            phrase_key=self._phrase_key,
+            ancestors=self._ancestors(),
+            positions=[frame.position for frame in self._stack],
+            phrase_index=self._phrase_index,
+        )
+
+    def _ancestors(self) -> list[KeyType]:
+        return [
+            frame.ngrams[frame.position]
+            for frame in self._stack
+            if frame.position != -1
+        ]
+
+    def run(
+        self, limit: int = 0, max_seconds: float = 0, max_nodes: int = 0
+    ) -> Iterator[str]:
+        """
+        Continues the search, stopping once limit phrases have been yielded, or after
+        max_seconds or max_nodes ngrams have been visited.
         """
+        deadline = time.monotonic() + max_seconds if max_seconds else 0
+        produced = 0
+        nodes = 0
+
+        while True:
+            if self._phrase_index is not None:
+                groups = [
+                    self._anagrammer.get_group_by_key(ngram)
+                    for ngram in self._ancestors()
+                ]
+                total = math.prod(len(group) for group in groups)
+                while self._phrase_index < total:
+                    if limit and produced >= limit:
+                        return
+                    if deadline and time.monotonic() >= deadline:
+                        return
+                    yield " ".join(_nth_product(groups, self._phrase_index))
+                    self._phrase_index += 1
+                    produced += 1
+                self._phrase_index = None
+
+            if not self._stack:
+                return
+
+            if limit and produced >= limit:
+                return
+            if max_nodes and nodes >= max_nodes:
+                return
+            if deadline and time.monotonic() >= deadline:
+                return
 
-        parent = ancestors[-1] if ancestors else ()
-
-        if phrase_key == ():
-            if len(ancestors) >= options.min_words:
-                yield ancestors
-            return
-
-        if options.max_words and len(ancestors) >= options.max_words:
-            return
-
-        for ngram, complement in self._get_ngrams(
-            phrase_key=phrase_key,
-            min_len=options.min_word_length,
-            max_len=options.max_word_length,
-        ):
-            if (
-                parent == ()
-                or len(ngram) < len(parent)
-                or (len(ngram) == len(parent) and ngram >= parent)
+            frame = self._stack[-1]
+            frame.position += 1
+            if frame.position == len(frame.ngrams):
+                self._stack.pop()
+                continue
+
+            nodes += 1
+            ngram = frame.ngrams[frame.position]
+            remainder = _subtract(frame.remainder, ngram)
+
+            if remainder == ():
+                if len(self._stack) >= self._options.min_words:
+                    self._phrase_index = 0
+            elif not (
+                self._options.max_words and len(self._stack) >= self._options.max_words
             ):
-                yield from self._get_ngram_groups(
-                    phrase_key=complement,
-                    ancestors=ancestors + (ngram,),
-                    options=options,
+                self._stack.append(
+                    _Frame(
+                        remainder,
+                        self._anagrammer._get_ngrams(remainder, ngram, self._options),
+                    )
                 )
 
-    def _get_ngrams(
-        self, phrase_key: KeyType, min_len: int, max_len: int
-    ) -> Iterable[tuple[KeyType, KeyType]]:
-        """
-        Generator that yields one tuple of (ngram, remainder) for each unique
-        ngram in the input phrase_key that is also a known anagram key, in
-        descending order of ngram size.
-        """
-        if max_len == 0:
-            max_len = len(phrase_key)
-        else:
-            max_len = min(max_len, len(phrase_key))
 
-        if min_len == 0:
-            min_len = 1
+def _ngram_order(ngram: KeyType) -> tuple[int, KeyType]:
+    return -len(ngram), ngram
+
+
+def _subtract(key: KeyType, ngram: KeyType) -> KeyType:
+    remainder = list(key)
+    for letter in ngram:
+        remainder.remove(letter)
+    return tuple(remainder)
 
-        for i in range(max_len, min_len - 1, -1):
-            seen = set()
-            for ngram in itertools.combinations(phrase_key, i):
-                if ngram in seen or ngram not in self._groups:
-                    continue
 
-                seen.add(ngram)
+def _nth_product(groups: list[list[str]], n: int) -> list[str]:
+    """
+    Returns the nth item that itertools.product(*groups) would yield.
+    """
+    words = []
+    for group in reversed(groups):
+        n, i = divmod(n, len(group))
+        words.append(group[i])
+    words.reverse()
+    return words
 
-                complement_counter = Counter(phrase_key) - Counter(ngram)
-                complement: list[str] = []
-                for letter, count in complement_counter.items():
-                    complement.extend((letter,) * count)
 
-                yield ngram, tuple(sorted(complement))
+_LETTER_BITS = {letter: 1 << i for i, letter in enumerate(string.ascii_lowercase)}
+
+
+def _letter_mask(key: KeyType) -> int:
+    """
+    Returns a bitmask with one bit set for each distinct letter in key.
+    """
+    mask = 0
+    for letter in set(key):
+        mask |= _LETTER_BITS[letter]
+    return mask
+
+
+def _letter_counts(key: KeyType) -> LetterCounts:
+    return tuple((letter, key.count(letter)) for letter in dict.fromkeys(key))
+
+
+def _submasks(mask: int) -> Iterator[int]:
+    """
+    Yields every non-empty subset of the bits set in mask.
+    """
+    submask = mask
+    while submask:
+        yield submask
+        submask = (submask - 1) & mask
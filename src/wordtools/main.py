@@ -1,11 +1,15 @@
+import json
+import sys
 from typing import Annotated, Optional
 
 import typer
 
-from wordtools.anagrams import Anagrammer, AnagramOptions
+from wordtools.anagrams import AnagramCursor, Anagrammer, AnagramOptions
 from wordtools.letter_boxed import letter_boxed
+from wordtools.patterns import PatternMatcher
 from wordtools.spelling_bee import spelling_bee
 from wordtools.wordle import _get_candidates, parse_input, summarise
+from wordtools.wordle_tree import WordleTree, get_tree_path
 from wordtools.words import DefaultWordList, LengthGrouper, WordBag, get_default_words
 
 app = typer.Typer()
@@ -35,6 +39,9 @@ def anagram(
     min_word_length: min_word_length_option = 0,
     include_word: include_word_option = None,
     exclude_word: exclude_word_option = None,
+    page_size: Annotated[int, typer.Option(min=0)] = 0,
+    max_seconds: Annotated[float, typer.Option(min=0)] = 0,
+    cursor: Annotated[str, typer.Option(show_default=False)] = "",
 ) -> None:
     words = WordBag(includes=get_default_words(word_list))
     anagrammer = Anagrammer(words)
@@ -48,9 +55,44 @@ def anagram(
         exclude_words=set(exclude_word or []),
     )
 
-    for anag in anagrammer.anagram_phrase(phrase, options=options):
+    if not (page_size or max_seconds or cursor):
+        for anag in anagrammer.anagram_phrase(phrase, options=options):
+            print(anag)
+        return
+
+    page, next_cursor = anagrammer.anagram_page(
+        phrase,
+        options=options,
+        cursor=AnagramCursor.from_json(json.loads(cursor)) if cursor else None,
+        limit=page_size,
+        max_seconds=max_seconds,
+    )
+    for anag in page:
         print(anag)
 
+    if next_cursor is not None:
+        print(
+            f"Next page: --cursor '{json.dumps(next_cursor.to_json())}'",
+            file=sys.stderr,
+        )
+
+
+@app.command(help="Finds words that can be made from some or all of the given letters.")
+def subanagram(
+    letters: Annotated[str, typer.Argument()],
+    word_list: word_list_option = DefaultWordList.ALL,
+    min_word_length: min_word_length_option = 1,
+) -> None:
+    words = WordBag(includes=get_default_words(word_list))
+    anagrammer = Anagrammer(words)
+
+    by_length = anagrammer.subanagrams(letters, min_length=min_word_length)
+    for length in sorted(by_length, reverse=True):
+        print(f"===== {length} =====")
+        for word in by_length[length]:
+            print(word)
+        print()
+
 
 @app.command("letter-boxed")
 def _letter_boxed(
@@ -68,6 +110,26 @@ def _letter_boxed(
         print(solution)
 
 
+@app.command(
+    help=(
+        "Finds words matching a crossword style pattern. "
+        "? matches any letter. "
+        "* matches any number of letters. "
+        "[abc] matches one of a, b or c, and [^abc] matches any other letter. "
+        "Example: 'c?t*' matches 'cat' and 'cottage'"
+    )
+)
+def pattern(
+    pattern: Annotated[str, typer.Argument()],
+    word_list: word_list_option = DefaultWordList.LARGE,
+) -> None:
+    words = WordBag(includes=get_default_words(word_list))
+    matcher = PatternMatcher(words)
+
+    for word in matcher.match(pattern):
+        print(word)
+
+
 @app.command(
     help=(
         "Guesses are entered as follows: "
@@ -90,6 +152,21 @@ def wordle(
     parsed_input = [parse_input(g) for g in guess]
     input_len = len(parsed_input[0])
 
+    tree_path = get_tree_path(word_list, input_len)
+    if tree_path.exists():
+        tree = WordleTree.load(tree_path)
+        try:
+            next_guess = tree.next_guess(parsed_input)
+        except ValueError as e:
+            print(f"Not using precomputed tree: {e}")
+            print()
+        else:
+            if next_guess is None:
+                print("Solved!")
+            else:
+                print(f"Next guess: {next_guess}")
+            return
+
     candidates = by_length.get_group("a" * input_len)
     for guess_ in parsed_input:
         candidates = _get_candidates(guess_, candidates)
@@ -100,6 +177,35 @@ def wordle(
     print(summarise(candidates))
 
 
+@app.command(
+    "wordle-tree",
+    help=(
+        "Precomputes the best guesses for every Wordle answer of the given length. "
+        "The wordle command then uses this to suggest the next guess."
+    ),
+)
+def _wordle_tree(
+    length: Annotated[int, typer.Argument(min=1)] = 5,
+    word_list: word_list_option = DefaultWordList.MEDIUM,
+    beam_width: Annotated[int, typer.Option(min=1)] = 2,
+    processes: Annotated[int, typer.Option(min=0)] = 0,
+) -> None:
+    words = WordBag(includes=get_default_words(word_list))
+    by_length = LengthGrouper(words)
+
+    tree = WordleTree.build(
+        by_length.get_group_by_key(length), beam_width=beam_width, processes=processes
+    )
+    tree_path = get_tree_path(word_list, length)
+    tree.save(tree_path)
+
+    average, worst = tree.stats()
+    print(f"Saved to {tree_path}")
+    print(f"First guess: {tree.root.guess}")
+    print(f"Average guesses: {average:.3f}")
+    print(f"Worst case guesses: {worst}")
+
+
 @app.command("spelling-bee")
 def _spelling_bee(
     letters: Annotated[str, typer.Argument()],
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import dataclasses
+import itertools
+from collections.abc import Collection, Iterator
+
+
+@dataclasses.dataclass(frozen=True)
+class PatternToken:
+    """
+    A single element of a pattern.
+
+    Matches one letter from letters (or any letter not in letters, if negated), or
+    any number of letters if star is set.
+    """
+
+    letters: frozenset[str] = frozenset()
+    negated: bool = False
+    star: bool = False
+
+    def matches(self, letter: str) -> bool:
+        return self.star or ((letter in self.letters) != self.negated)
+
+
+ANY_LETTER = PatternToken(negated=True)
+ANY_LETTERS = PatternToken(star=True)
+
+
+def parse_pattern(pattern: str) -> list[PatternToken]:
+    """
+    Parses a crossword style pattern:
+
+    - Letters match themselves
+    - ? matches any single letter
+    - * matches any number of letters (including none)
+    - [abc] matches any one of the letters a, b or c
+    - [^abc] matches any one letter except a, b or c
+    """
+    tokens: list[PatternToken] = []
+    pattern_iter = iter(pattern)
+    for char in pattern_iter:
+        match char:
+            case "?":
+                tokens.append(ANY_LETTER)
+            case "*":
+                # Consecutive stars are equivalent to a single star.
+                if not tokens or tokens[-1] != ANY_LETTERS:
+                    tokens.append(ANY_LETTERS)
+            case "[":
+                letters = []
+                for set_char in pattern_iter:
+                    if set_char == "]":
+                        break
+                    letters.append(set_char)
+                else:
+                    raise ValueError(f"Unterminated letter set in {pattern!r}")
+                negated = letters[:1] == ["^"]
+                if negated:
+                    letters = letters[1:]
+                if not letters:
+                    raise ValueError(f"Empty letter set in {pattern!r}")
+                tokens.append(PatternToken(letters=frozenset(letters), negated=negated))
+            case "]":
+                raise ValueError(f"Unexpected ']' in {pattern!r}")
+            case _:
+                tokens.append(PatternToken(letters=frozenset(char)))
+
+    return tokens
+
+
+class _Node:
+    __slots__ = ("id", "final", "edges")
+
+    _ids = itertools.count()
+
+    def __init__(self) -> None:
+        self.id = next(self._ids)
+        self.final = False
+        self.edges: dict[str, _Node] = {}
+
+    def signature(self) -> tuple[bool, tuple[tuple[str, int], ...]]:
+        return self.final, tuple(
+            (letter, node.id) for letter, node in self.edges.items()
+        )
+
+
+class PatternMatcher:
+    """
+    Indexes words for matching against patterns, prefixes and suffixes.
+
+    Words are stored in a minimised DAWG (directed acyclic word graph): a trie in
+    which identical subtrees are merged, so common suffixes are shared as well as
+    common prefixes. Queries are answered by traversing the graph, so only branches
+    that can still match the pattern are visited.
+
+    Words can be added and removed like a WordGrouper. The graph is rebuilt on the
+    next query after any change.
+    """
+
+    def __init__(self, words: Collection[str]) -> None:
+        self._words: set[str] = set()
+        self._root: _Node | None = None
+
+        for word in words:
+            self.add_word(word)
+
+    def add_word(self, word: str) -> None:
+        if word not in self._words:
+            self._words.add(word)
+            self._root = None
+
+    def remove_word(self, word: str) -> None:
+        self._words.remove(word)
+        self._root = None
+
+    def __contains__(self, word: object) -> bool:
+        return word in self._words
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    @property
+    def root(self) -> _Node:
+        if self._root is None:
+            self._root = self._build()
+        return self._root
+
+    def _build(self) -> _Node:
+        """
+        Builds the minimised graph incrementally from the sorted words.
+
+        See Daciuk et al., "Incremental Construction of Minimal Acyclic Finite-State
+        Automata" (2000). Once a word has been added, the part of the previous word
+        that isn't shared with it can never change again, so its nodes are replaced
+        by an equivalent existing node where there is one.
+        """
+        root = _Node()
+        register: dict[tuple[bool, tuple[tuple[str, int], ...]], _Node] = {}
+        unchecked: list[tuple[_Node, str, _Node]] = []
+
+        def minimise(down_to: int) -> None:
+            while len(unchecked) > down_to:
+                parent, letter, child = unchecked.pop()
+                signature = child.signature()
+                if signature in register:
+                    parent.edges[letter] = register[signature]
+                else:
+                    register[signature] = child
+
+        previous = ""
+        for word in sorted(self._words):
+            common = 0
+            for a, b in zip(word, previous):
+                if a != b:
+                    break
+                common += 1
+
+            minimise(common)
+
+            node = unchecked[-1][2] if unchecked else root
+            for letter in word[common:]:
+                child = _Node()
+                node.edges[letter] = child
+                unchecked.append((node, letter, child))
+                node = child
+            node.final = True
+
+            previous = word
+
+        minimise(0)
+
+        return root
+
+    def node_count(self) -> int:
+        seen: set[int] = set()
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.id in seen:
+                continue
+            seen.add(node.id)
+            stack.extend(node.edges.values())
+        return len(seen)
+
+    def match(self, pattern: str) -> Iterator[str]:
+        """
+        Yields all words matching the pattern, in sorted order.
+
+        See parse_pattern for the pattern syntax.
+        """
+        tokens = parse_pattern(pattern)
+        yield from self._match(
+            self.root, "", tokens, self._advance(tokens, {0}), dead_ends=set()
+        )
+
+    def with_prefix(self, prefix: str) -> Iterator[str]:
+        node = self.root
+        for letter in prefix:
+            if letter not in node.edges:
+                return
+            node = node.edges[letter]
+        yield from self._match(node, prefix, [ANY_LETTERS], {0, 1}, dead_ends=set())
+
+    def with_suffix(self, suffix: str) -> Iterator[str]:
+        tokens = [ANY_LETTERS, *(PatternToken(letters=frozenset(c)) for c in suffix)]
+        yield from self._match(
+            self.root, "", tokens, self._advance(tokens, {0}), dead_ends=set()
+        )
+
+    @staticmethod
+    def _advance(tokens: list[PatternToken], states: set[int]) -> set[int]:
+        # A star can match nothing, so being before one also means being after it.
+        for state in sorted(states):
+            if state < len(tokens) and tokens[state].star:
+                states.add(state + 1)
+        return states
+
+    def _match(
+        self,
+        node: _Node,
+        prefix: str,
+        tokens: list[PatternToken],
+        states: set[int],
+        dead_ends: set[tuple[int, frozenset[int]]],
+    ) -> Iterator[str]:
+        """
+        Simulates the pattern as an NFA while walking the graph. Each state is the
+        index of the next token to match, so each word is only yielded once however
+        many ways it matches.
+
+        Nodes are shared between many words, so a node that matched nothing in some
+        set of states is remembered and skipped if it's reached again.
+        """
+        key = (node.id, frozenset(states))
+        if key in dead_ends:
+            return
+
+        found = False
+
+        if node.final and len(tokens) in states:
+            found = True
+            yield prefix
+
+        for letter, child in node.edges.items():
+            next_states = set()
+            for state in states:
+                if state == len(tokens):
+                    continue
+                token = tokens[state]
+                if token.star:
+                    next_states.add(state)
+                elif token.matches(letter):
+                    next_states.add(state + 1)
+
+            if next_states:
+                for word in self._match(
+                    child,
+                    prefix + letter,
+                    tokens,
+                    self._advance(tokens, next_states),
+                    dead_ends,
+                ):
+                    found = True
+                    yield word
+
+        if not found:
+            dead_ends.add(key)
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import json
+import pathlib
+from collections.abc import Collection, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from wordtools.wordle import WordleColour, WordleGuess
+from wordtools.words import DATA_PATH
+
+WORDLE_TREES_PATH = DATA_PATH / "wordle-trees"
+WORDLE_TREES_PATH.mkdir(parents=True, exist_ok=True)
+
+_COLOUR_DIGITS = {
+    WordleColour.grey: 0,
+    WordleColour.yellow: 1,
+    WordleColour.green: 2,
+}
+
+
+def get_feedback(guess: str, answer: str) -> int:
+    """
+    Returns the feedback Wordle would give for guess against answer.
+
+    The feedback is encoded as a base 3 integer, with one digit per letter (most
+    significant first): 0 for grey, 1 for yellow and 2 for green.
+    """
+    # Answer letters not matched by a green are available to match yellows.
+    unmatched = [a for g, a in zip(guess, answer) if g != a]
+
+    feedback = 0
+    for g, a in zip(guess, answer):
+        if g == a:
+            digit = 2
+        elif g in unmatched:
+            unmatched.remove(g)
+            digit = 1
+        else:
+            digit = 0
+        feedback = feedback * 3 + digit
+    return feedback
+
+
+def encode_guess(guess: WordleGuess) -> tuple[str, int]:
+    """
+    Converts a parsed guess into the guessed word and its encoded feedback.
+    """
+    feedback = 0
+    for hint in guess:
+        feedback = feedback * 3 + _COLOUR_DIGITS[hint.colour]
+    return "".join(hint.letter for hint in guess), feedback
+
+
+def get_tree_path(word_list: str, length: int) -> pathlib.Path:
+    return WORDLE_TREES_PATH / f"{word_list}-{length}.json.gz"
+
+
+def _solved(length: int) -> int:
+    return int(3**length) - 1
+
+
+@dataclasses.dataclass
+class WordleNode:
+    """
+    A node in a WordleTree.
+
+    is_answer is set if guess is itself one of the remaining possible answers.
+    Children are keyed by the feedback received for guess.
+    """
+
+    guess: str
+    is_answer: bool
+    children: dict[int, WordleNode] = dataclasses.field(default_factory=dict)
+
+    def to_json(self) -> list[Any]:
+        return [
+            self.guess,
+            int(self.is_answer),
+            {
+                str(feedback): child.to_json()
+                for feedback, child in self.children.items()
+            },
+        ]
+
+    @classmethod
+    def from_json(cls, data: list[Any]) -> WordleNode:
+        guess, is_answer, children = data
+        return cls(
+            guess=guess,
+            is_answer=bool(is_answer),
+            children={
+                int(feedback): cls.from_json(child)
+                for feedback, child in children.items()
+            },
+        )
+
+
+class WordleTree:
+    """
+    A precomputed guessing strategy covering every answer in a word list.
+
+    Finding the next guess is a single step down the tree for each guess made,
+    rather than filtering and scoring the word list again.
+    """
+
+    def __init__(self, root: WordleNode) -> None:
+        self.root = root
+
+    @classmethod
+    def build(
+        cls, words: Collection[str], *, beam_width: int = 2, processes: int = 0
+    ) -> WordleTree:
+        return cls(build_tree(words, beam_width=beam_width, processes=processes))
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> WordleTree:
+        with gzip.open(path, "rt") as f:
+            return cls(WordleNode.from_json(json.load(f)))
+
+    def save(self, path: pathlib.Path) -> None:
+        with gzip.open(path, "wt") as f:
+            json.dump(self.root.to_json(), f, separators=(",", ":"))
+
+    def next_guess(self, guesses: list[WordleGuess]) -> str | None:
+        """
+        Walks the tree using the feedback from each guess, and returns the next word
+        to guess. Returns None if the last guess was correct.
+
+        Raises ValueError if the guesses did not follow the tree.
+        """
+        node = self.root
+        for guess in guesses:
+            word, feedback = encode_guess(guess)
+            if word != node.guess:
+                raise ValueError(f"Expected guess {node.guess!r}, got {word!r}")
+            if feedback == _solved(len(word)):
+                return None
+            if feedback not in node.children:
+                raise ValueError(f"No known word matches the feedback for {word!r}")
+            node = node.children[feedback]
+
+        return node.guess
+
+    def _depths(self) -> Iterator[int]:
+        """
+        Yields the number of guesses needed for each answer covered by the tree.
+        """
+        stack = [(self.root, 1)]
+        while stack:
+            node, depth = stack.pop()
+            if node.is_answer:
+                yield depth
+            for child in node.children.values():
+                stack.append((child, depth + 1))
+
+    def stats(self) -> tuple[float, int]:
+        """
+        Returns the average and worst case number of guesses.
+        """
+        depths = list(self._depths())
+        return sum(depths) / len(depths), max(depths)
+
+
+type Partition = dict[int, list[str]]
+
+
+def build_tree(
+    words: Collection[str], *, beam_width: int = 2, processes: int = 0
+) -> WordleNode:
+    """
+    Builds a guessing strategy that minimises the total number of guesses needed to
+    find every word in words, which must all be the same length.
+
+    This is a depth first branch and bound search:
+
+    - At each node only the beam_width most promising guesses are tried, ranked by
+      the expected number of remaining candidates after guessing them.
+    - A guess is abandoned as soon as a lower bound on its cost is no better than
+      the best guess found so far.
+    - The candidate first guesses are searched in parallel, in a pool of processes.
+    """
+    candidates = sorted(words)
+
+    if not candidates:
+        raise ValueError("At least one word must be supplied")
+
+    if len({len(word) for word in candidates}) != 1:
+        raise ValueError("All words must be the same length")
+
+    if len(candidates) == 1:
+        return WordleNode(guess=candidates[0], is_answer=True)
+
+    ranked = _rank_guesses(candidates, candidates, beam_width)
+
+    with ProcessPoolExecutor(max_workers=processes or None) as executor:
+        results = executor.map(
+            _search_root_guess,
+            ((guess, partition, candidates, beam_width) for guess, partition in ranked),
+        )
+        best = min(
+            (result for result in results if result is not None),
+            key=lambda result: result[1],
+        )
+
+    return best[0]
+
+
+def _search_root_guess(
+    args: tuple[str, Partition, list[str], int],
+) -> tuple[WordleNode, int] | None:
+    guess, partition, candidates, beam_width = args
+    return _search_guess(
+        guess,
+        partition,
+        n=len(candidates),
+        guesses=candidates,
+        beam_width=beam_width,
+        bound=float("inf"),
+    )
+
+
+def _partition(guess: str, candidates: list[str]) -> Partition:
+    partition: Partition = {}
+    for answer in candidates:
+        partition.setdefault(get_feedback(guess, answer), []).append(answer)
+    return partition
+
+
+def _bucket_lower_bound(bucket: list[str]) -> int:
+    # Every word needs at least one more guess, and all but one need at least two.
+    return 1 if len(bucket) == 1 else 2 * len(bucket) - 1
+
+
+def _rank_guesses(
+    candidates: list[str], guesses: list[str], beam_width: int
+) -> list[tuple[str, Partition]]:
+    solved = _solved(len(candidates[0]))
+
+    scored = []
+    for guess in guesses:
+        partition = _partition(guess, candidates)
+        if len(partition) == 1 and solved not in partition:
+            # Tells us nothing new.
+            continue
+        # Prefer guesses that leave fewer candidates on average, then guesses that
+        # might be the answer.
+        score = sum(len(bucket) ** 2 for bucket in partition.values())
+        scored.append((score, solved not in partition, guess, partition))
+
+    scored.sort(key=lambda item: item[:3])
+
+    return [(guess, partition) for _, _, guess, partition in scored[:beam_width]]
+
+
+def _search(
+    candidates: list[str], guesses: list[str], beam_width: int, bound: float
+) -> tuple[WordleNode, int] | None:
+    """
+    Returns the best subtree found for candidates, and its total number of guesses,
+    or None if nothing costs less than bound.
+    """
+    n = len(candidates)
+
+    if n <= 2:
+        # Guessing one of them is always optimal.
+        node = WordleNode(guess=candidates[0], is_answer=True)
+        if n == 2:
+            feedback = get_feedback(candidates[0], candidates[1])
+            node.children[feedback] = WordleNode(guess=candidates[1], is_answer=True)
+        cost = 2 * n - 1
+        return (node, cost) if cost < bound else None
+
+    best = None
+    for guess, partition in _rank_guesses(candidates, guesses, beam_width):
+        result = _search_guess(guess, partition, n, guesses, beam_width, bound)
+        if result is not None:
+            best = result
+            bound = result[1]
+
+    return best
+
+
+def _search_guess(
+    guess: str,
+    partition: Partition,
+    n: int,
+    guesses: list[str],
+    beam_width: int,
+    bound: float,
+) -> tuple[WordleNode, int] | None:
+    solved = _solved(len(guess))
+    node = WordleNode(guess=guess, is_answer=solved in partition)
+
+    # Everything needs this guess, then at least the lower bound for each bucket.
+    # Lower bounds are replaced by actual costs as each bucket is searched.
+    buckets = [
+        (feedback, bucket)
+        for feedback, bucket in partition.items()
+        if feedback != solved
+    ]
+    cost = n + sum(_bucket_lower_bound(bucket) for _, bucket in buckets)
+    if cost >= bound:
+        return None
+
+    # Search the biggest buckets first, as they are the most likely to exceed the bound.
+    for feedback, bucket in sorted(buckets, key=lambda item: -len(item[1])):
+        bucket_bound = _bucket_lower_bound(bucket)
+        result = _search(bucket, guesses, beam_width, bound - cost + bucket_bound)
+        if result is None:
+            return None
+        child, child_cost = result
+        node.children[feedback] = child
+        cost += child_cost - bucket_bound
+
+    return node, cost
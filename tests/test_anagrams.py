@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from wordtools.anagrams import AnagramCursor, Anagrammer, AnagramOptions
+
+WORDS = ["stain", "satin", "saint", "train", "tin", "it", "a", "tint", "retains"]
+
+
+def test_subanagrams():
+    anagrammer = Anagrammer(WORDS)
+
+    assert anagrammer.subanagrams("Satin!") == {
+        5: ["saint", "satin", "stain"],
+        3: ["tin"],
+        2: ["it"],
+        1: ["a"],
+    }
+
+
+def test_subanagrams_respects_letter_counts():
+    anagrammer = Anagrammer(WORDS)
+
+    assert 4 not in anagrammer.subanagrams("tinsa")
+    assert anagrammer.subanagrams("tint", min_length=4) == {4: ["tint"]}
+
+
+def test_subanagrams_after_changes():
+    anagrammer = Anagrammer(WORDS)
+    assert anagrammer.subanagrams("retains", min_length=6) == {7: ["retains"]}
+
+    anagrammer.add_word("nastier")
+    anagrammer.remove_word("retains")
+
+    assert anagrammer.subanagrams("retains", min_length=6) == {7: ["nastier"]}
+
+
+PHRASE_WORDS = ["a", "at", "tan", "ant", "nat", "tana", "tanna", "n", "t"]
+
+
+def test_anagram_phrase():
+    anagrammer = Anagrammer(PHRASE_WORDS)
+
+    assert list(anagrammer.anagram_phrase("tanna", AnagramOptions(max_words=2))) == [
+        "tanna",
+        "tana n",
+    ]
+
+
+def test_anagram_pages():
+    anagrammer = Anagrammer(PHRASE_WORDS)
+    options = AnagramOptions()
+    expected = list(anagrammer.anagram_phrase("tanna", options))
+
+    for page_options in [{"limit": 1}, {"limit": 4}, {"max_nodes": 2}]:
+        phrases = []
+        cursor = None
+        while True:
+            page, cursor = anagrammer.anagram_page(
+                "tanna", options, cursor=cursor, **page_options
+            )
+            phrases.extend(page)
+            if cursor is None:
+                break
+            cursor = AnagramCursor.from_json(json.loads(json.dumps(cursor.to_json())))
+
+        assert phrases == expected
+
+
+def test_anagram_page_wrong_phrase():
+    anagrammer = Anagrammer(PHRASE_WORDS)
+    _, cursor = anagrammer.anagram_page("tanna", AnagramOptions(), limit=1)
+
+    with pytest.raises(ValueError):
+        anagrammer.anagram_page("at", AnagramOptions(), cursor=cursor)
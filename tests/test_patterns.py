@@ -0,0 +1,44 @@
+import pytest
+
+from wordtools.patterns import PatternMatcher
+
+WORDS = ["cat", "cot", "cottage", "cut", "cute", "act", "bat", "bate", "acute"]
+
+
+def test_match():
+    matcher = PatternMatcher(WORDS)
+
+    assert list(matcher.match("c?t*")) == ["cat", "cot", "cottage", "cut", "cute"]
+    assert list(matcher.match("[bc]at")) == ["bat", "cat"]
+    assert list(matcher.match("?[^a]t*")) == ["act", "cot", "cottage", "cut", "cute"]
+    assert list(matcher.match("*t*e")) == ["acute", "bate", "cottage", "cute"]
+    assert list(matcher.match("dog")) == []
+
+
+def test_prefix_and_suffix():
+    matcher = PatternMatcher(WORDS)
+
+    assert list(matcher.with_prefix("cut")) == ["cut", "cute"]
+    assert list(matcher.with_suffix("ute")) == ["acute", "cute"]
+
+
+def test_shares_nodes():
+    matcher = PatternMatcher(WORDS)
+
+    # The "te" ending of "cute", "acute" and "bate" is stored once, among others.
+    assert matcher.node_count() < sum(len(word) for word in WORDS)
+
+
+def test_add_and_remove():
+    matcher = PatternMatcher(WORDS)
+    assert list(matcher.match("?ute")) == ["cute"]
+
+    matcher.add_word("mute")
+    matcher.remove_word("cute")
+
+    assert list(matcher.match("?ute")) == ["mute"]
+
+
+def test_invalid_pattern():
+    with pytest.raises(ValueError):
+        list(PatternMatcher(WORDS).match("c[at"))
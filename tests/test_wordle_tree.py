@@ -0,0 +1,35 @@
+from wordtools.wordle import parse_input
+from wordtools.wordle_tree import WordleTree, get_feedback
+
+WORDS = ["blush", "brush", "crush", "crust", "flush", "plush", "trust", "shout"]
+
+
+def test_feedback():
+    assert get_feedback("crust", "crust") == 3**5 - 1
+    assert get_feedback("abcde", "fghij") == 0
+    # The green s uses up one of the two in the answer, so only one s is yellow.
+    assert get_feedback("sassy", "bless") == int("10020", 3)
+
+
+def test_tree_finds_every_word():
+    tree = WordleTree.build(WORDS, processes=1)
+
+    for answer in WORDS:
+        guesses = []
+        while (guess := tree.next_guess(guesses)) is not None:
+            feedback = get_feedback(guess, answer)
+            hints = ""
+            for letter in reversed(guess):
+                feedback, digit = divmod(feedback, 3)
+                hints = [letter, letter.upper(), f".{letter}"][digit] + hints
+            guesses.append(parse_input(hints))
+        assert guesses[-1] == parse_input("." + ".".join(answer))
+
+
+def test_save_and_load(tmp_path):
+    tree = WordleTree.build(WORDS, processes=1)
+    path = tmp_path / "tree.json.gz"
+    tree.save(path)
+
+    assert WordleTree.load(path).root == tree.root
+    assert WordleTree.load(path).stats() == tree.stats()